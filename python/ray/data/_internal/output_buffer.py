@@ -1,8 +1,11 @@
-from typing import Callable, Any, Optional
+from typing import Callable, Any, Optional, TYPE_CHECKING
 
 from ray.data.block import Block, DataBatch, BlockAccessor
 from ray.data._internal.delegating_block_builder import DelegatingBlockBuilder
 
+if TYPE_CHECKING:
+    import pyarrow
+
 
 class BlockOutputBuffer(object):
     """Generates output blocks of a given size given a stream of inputs.
@@ -36,24 +39,57 @@ class BlockOutputBuffer(object):
         self._target_max_block_size = target_max_block_size
         self._block_udf = block_udf
         self._buffer = DelegatingBlockBuilder()
+        # Arrow record batches buffered until the next block is built, so that they
+        # can be combined into a single table at once.
+        self._record_batches = []
+        self._record_batches_num_rows = 0
+        self._record_batches_size_bytes = 0
         self._returned_at_least_one_block = False
         self._finalized = False
 
     def add(self, item: Any) -> None:
         """Add a single item to this output buffer."""
         assert not self._finalized
+        self._flush_record_batches()
         self._buffer.add(item)
 
     def add_batch(self, batch: DataBatch) -> None:
         """Add a data batch to this output buffer."""
         assert not self._finalized
+        self._flush_record_batches()
         self._buffer.add_batch(batch)
 
     def add_block(self, block: Block) -> None:
         """Add a data block to this output buffer."""
         assert not self._finalized
+        self._flush_record_batches()
         self._buffer.add_block(block)
 
+    def add_record_batch(self, batch: "pyarrow.RecordBatch") -> None:
+        """Add an Arrow record batch to this output buffer.
+
+        Consecutive record batches with the same schema are combined into a single
+        Arrow table block only when the next output block is built.
+        """
+        assert not self._finalized
+        if self._record_batches and not batch.schema.equals(
+            self._record_batches[0].schema
+        ):
+            self._flush_record_batches()
+        self._record_batches.append(batch)
+        self._record_batches_num_rows += batch.num_rows
+        self._record_batches_size_bytes += batch.nbytes
+
+    def _flush_record_batches(self) -> None:
+        if not self._record_batches:
+            return
+        import pyarrow
+
+        self._buffer.add_block(pyarrow.Table.from_batches(self._record_batches))
+        self._record_batches = []
+        self._record_batches_num_rows = 0
+        self._record_batches_size_bytes = 0
+
     def finalize(self) -> None:
         """Must be called once all items have been added."""
         assert not self._finalized
@@ -62,15 +98,21 @@ class BlockOutputBuffer(object):
     def has_next(self) -> bool:
         """Returns true when a complete output block is produced."""
         if self._finalized:
-            return not self._returned_at_least_one_block or self._buffer.num_rows() > 0
+            return (
+                not self._returned_at_least_one_block
+                or self._buffer.num_rows() + self._record_batches_num_rows > 0
+            )
         else:
             return (
-                self._buffer.get_estimated_memory_usage() > self._target_max_block_size
+                self._buffer.get_estimated_memory_usage()
+                + self._record_batches_size_bytes
+                > self._target_max_block_size
             )
 
     def next(self) -> Block:
         """Returns the next complete output block."""
         assert self.has_next()
+        self._flush_record_batches()
         block = self._buffer.build()
         accessor = BlockAccessor.for_block(block)
         if self._block_udf and accessor.num_rows() > 0:
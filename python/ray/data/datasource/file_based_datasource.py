@@ -35,6 +35,7 @@ from ray.types import ObjectRef
 from ray.util.annotations import DeveloperAPI, PublicAPI
 
 if TYPE_CHECKING:
+    import fsspec
     import pyarrow
 
 
@@ -517,7 +518,13 @@ def _resolve_paths_and_filesystem(
             # file systems implementation in pyarrow.fs.FileSystem.
             need_unwrap_path_protocol = False
 
-        filesystem = PyFileSystem(FSSpecHandler(filesystem))
+        native_filesystem = _to_pyarrow_s3_filesystem(filesystem, paths)
+        if native_filesystem is not None:
+            # Read S3 through pyarrow's native filesystem rather than calling back
+            # into the fsspec filesystem from Arrow for every file read.
+            filesystem = native_filesystem
+        else:
+            filesystem = PyFileSystem(FSSpecHandler(filesystem))
 
     resolved_paths = []
     for path in paths:
@@ -562,6 +569,74 @@ def _resolve_paths_and_filesystem(
     return resolved_paths, filesystem
 
 
+def _to_pyarrow_s3_filesystem(
+    filesystem: "fsspec.spec.AbstractFileSystem",
+    paths: List[str],
+) -> Optional["pyarrow.fs.S3FileSystem"]:
+    """Converts an s3fs filesystem to an equivalent pyarrow S3FileSystem.
+
+    Args:
+        filesystem: The fsspec filesystem to convert.
+        paths: The paths that will be read, used to resolve the bucket region
+            when the filesystem doesn't set one.
+
+    Returns:
+        A pyarrow S3FileSystem with the same credentials, region and endpoint, or
+        None if the filesystem isn't an s3fs filesystem, uses options that can't
+        be mapped to pyarrow, or its region can't be determined.
+    """
+    try:
+        from s3fs import S3FileSystem as FSSpecS3FileSystem
+    except ModuleNotFoundError:
+        return None
+    if not isinstance(filesystem, FSSpecS3FileSystem):
+        return None
+
+    client_kwargs = dict(getattr(filesystem, "client_kwargs", None) or {})
+    endpoint_override = client_kwargs.pop("endpoint_url", None) or getattr(
+        filesystem, "endpoint_url", None
+    )
+    region = client_kwargs.pop("region_name", None)
+    if (
+        client_kwargs
+        or getattr(filesystem, "kwargs", None)
+        or getattr(filesystem, "config_kwargs", None)
+        or getattr(filesystem, "s3_additional_kwargs", None)
+        or getattr(filesystem, "requester_pays", False)
+        or getattr(filesystem, "version_aware", False)
+        or getattr(filesystem, "session", None) is not None
+    ):
+        # Keep using s3fs for options that pyarrow doesn't support, including
+        # botocore session options such as ``profile``.
+        return None
+
+    from pyarrow.fs import S3FileSystem, resolve_s3_region
+
+    if region is None and endpoint_override is None:
+        # s3fs follows the bucket's region automatically, whereas pyarrow fails
+        # with a redirect if the region is wrong, so look it up the same way.
+        buckets = {_unwrap_protocol(path).split("/", 1)[0] for path in paths}
+        try:
+            regions = {resolve_s3_region(bucket) for bucket in buckets}
+        except (OSError, ValueError):
+            return None
+        if len(regions) != 1:
+            return None
+        (region,) = regions
+
+    kwargs = {
+        "anonymous": bool(getattr(filesystem, "anon", False)),
+        "access_key": getattr(filesystem, "key", None),
+        "secret_key": getattr(filesystem, "secret", None),
+        "session_token": getattr(filesystem, "token", None),
+        "region": region,
+        "endpoint_override": endpoint_override,
+    }
+    if not getattr(filesystem, "use_ssl", True):
+        kwargs["scheme"] = "http"
+    return S3FileSystem(**{k: v for k, v in kwargs.items() if v is not None})
+
+
 def _resolve_example_path(path: str) -> str:
     """If an example path adhering to the example protocol, resolve to the true
     underlying file path.
@@ -1,15 +1,31 @@
+import functools
 import itertools
 import logging
-from typing import TYPE_CHECKING, Callable, Iterator, List, Optional, Union
-
-import numpy as np
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
 
 from ray.data._internal.output_buffer import BlockOutputBuffer
 from ray.data._internal.progress_bar import ProgressBar
 from ray.data._internal.remote_fn import cached_remote_fn
-from ray.data._internal.util import _check_pyarrow_version
+from ray.data._internal.util import (
+    _check_pyarrow_version,
+    _lazy_import_pyarrow_dataset,
+)
 from ray.data.block import Block
-from ray.data.context import DatasetContext
+from ray.data.context import DEFAULT_SCHEDULING_STRATEGY, DatasetContext
 from ray.data.datasource.datasource import Reader, ReadTask
 from ray.data.datasource.file_based_datasource import _resolve_paths_and_filesystem
 from ray.data.datasource.file_meta_provider import (
@@ -23,19 +39,44 @@ from ray.util.annotations import PublicAPI
 import ray.cloudpickle as cloudpickle
 
 if TYPE_CHECKING:
-    import pyarrow
     from pyarrow.dataset import ParquetFileFragment
 
+# Imported once at module load rather than in every read task. The pyarrow
+# version is checked when the first reader is constructed.
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
 
 logger = logging.getLogger(__name__)
 
 PIECES_PER_META_FETCH = 6
 PARALLELIZE_META_FETCH_THRESHOLD = 24
 
-# The number of rows to read per batch. This is sized to generate 10MiB batches
-# for rows about 1KiB in size.
+# The number of CPUs to reserve for each metadata fetch task. Metadata fetching is
+# I/O-bound, so tasks reserve a fraction of a CPU to allow many to run per node.
+NUM_CPUS_FOR_META_FETCH_TASK = 0.5
+
+# The bounds of the number of rows to read per batch. The batch size is derived
+# from the row size in the file metadata, so that batches are about as big as the
+# target max block size.
+PARQUET_READER_MIN_ROW_BATCH_SIZE = 4096
+PARQUET_READER_MAX_ROW_BATCH_SIZE = 200000
+# The number of rows to read per batch when the file metadata isn't available.
+# This is sized to generate 10MiB batches for rows about 1KiB in size.
 PARQUET_READER_ROW_BATCH_SIZE = 100000
+# The number of batches to read ahead of the batch currently being processed, so
+# that downloading row groups overlaps with decoding and processing them.
+PARQUET_READER_PREFETCH_BATCHES = 2
 FILE_READING_RETRY = 8
+# The maximum backoff window in seconds between retries of file reading.
+MAX_RETRY_BACKOFF = 32
+
+# The maximum number of threads used to deserialize the file fragments of a single
+# read task. Fragment construction may initialize remote filesystem clients and
+# releases the GIL, so it is done concurrently.
+DESERIALIZE_PIECES_MAX_THREADS = 8
 
 # The estimated bytes size multiplier for reading Parquet data source in Arrow,
 # as Arrow in-memory representation uses much more memory compared to Parquet
@@ -46,80 +87,137 @@ PARQUET_TO_ARROW_SIZE_MULTIPLIER = 5
 
 # TODO(ekl) this is a workaround for a pyarrow serialization bug, where serializing a
 # raw pyarrow file fragment causes S3 network calls.
-class _SerializedPiece:
-    def __init__(self, frag: "ParquetFileFragment"):
-        self._data = cloudpickle.dumps(
-            (frag.format, frag.path, frag.filesystem, frag.partition_expression)
-        )
+class _SerializedPieceGroup:
+    """A group of serialized Parquet file fragments.
+
+    All fragments of a Parquet dataset share the same file format and filesystem, so
+    these are serialized only once per group, and only the path, partition
+    expression and (optional) subset of row groups to read are serialized per
+    fragment.
+    """
 
-    def deserialize(self) -> "ParquetFileFragment":
+    def __init__(
+        self,
+        frags: List["ParquetFileFragment"],
+        row_groups: Optional[List[Optional[List[int]]]] = None,
+    ):
+        if row_groups is None:
+            row_groups = [None] * len(frags)
+        if len(frags) > 0:
+            self._shared_data = cloudpickle.dumps(
+                (frags[0].format, frags[0].filesystem)
+            )
+        else:
+            self._shared_data = None
+        self._pieces = [
+            (frag.path, cloudpickle.dumps(frag.partition_expression), frag_row_groups)
+            for frag, frag_row_groups in zip(frags, row_groups)
+        ]
+
+    def __len__(self) -> int:
+        return len(self._pieces)
+
+    def deserialize(self) -> List["ParquetFileFragment"]:
+        if self._shared_data is None:
+            return []
         # Implicitly trigger S3 subsystem initialization by importing
         # pyarrow.fs.
         import pyarrow.fs  # noqa: F401
 
-        (file_format, path, filesystem, partition_expression) = cloudpickle.loads(
-            self._data
-        )
-        return file_format.make_fragment(path, filesystem, partition_expression)
+        (file_format, filesystem) = cloudpickle.loads(self._shared_data)
+
+        def make_fragment(piece) -> "ParquetFileFragment":
+            path, partition_expression, row_groups = piece
+            return file_format.make_fragment(
+                path,
+                filesystem,
+                cloudpickle.loads(partition_expression),
+                row_groups=row_groups,
+            )
+
+        if len(self._pieces) == 1:
+            return [make_fragment(self._pieces[0])]
+        num_threads = min(DESERIALIZE_PIECES_MAX_THREADS, len(self._pieces))
+        with ThreadPoolExecutor(max_workers=num_threads) as executor:
+            return list(executor.map(make_fragment, self._pieces))
 
 
 # Visible for test mocking.
 def _deserialize_pieces(
-    serialized_pieces: List[_SerializedPiece],
+    serialized_pieces: _SerializedPieceGroup,
 ) -> List["pyarrow._dataset.ParquetFileFragment"]:
-    return [p.deserialize() for p in serialized_pieces]
+    return serialized_pieces.deserialize()
 
 
-# This retry helps when the upstream datasource is not able to handle
-# overloaded read request or failed with some retriable failures.
-# For example when reading data from HA hdfs service, hdfs might
-# lose connection for some unknown reason expecially when
-# simutaneously running many hyper parameter tuning jobs
-# with ray.data parallelism setting at high value like the default 200
-# Such connection failure can be restored with some waiting and retry.
-def _deserialize_pieces_with_retry(
-    serialized_pieces: List[_SerializedPiece],
-) -> List["pyarrow._dataset.ParquetFileFragment"]:
+def _retry_with_backoff(
+    fn: Callable[[], Any],
+    exceptions: Tuple[Type[BaseException], ...],
+    description: str,
+    first_failure_message: str = "",
+) -> Any:
+    """Calls ``fn``, retrying up to FILE_READING_RETRY times on the given exceptions.
+
+    Retries back off exponentially with full jitter, so that concurrent tasks don't
+    retry in lockstep, capped at MAX_RETRY_BACKOFF seconds.
+
+    Args:
+        fn: The function to call.
+        exceptions: The exception types to retry on.
+        description: What ``fn`` does, for the logs of failed attempts.
+        first_failure_message: Extra context to log with the first failed attempt.
+    """
+    import random
+    import time
+
     min_interval = 0
     final_exception = None
     for i in range(FILE_READING_RETRY):
         try:
-            return _deserialize_pieces(serialized_pieces)
-        except Exception as e:
-            import random
-            import time
-
+            return fn()
+        except exceptions as e:
+            if not min_interval:
+                # to make retries of different process hit the storage service
+                # at slightly different time
+                min_interval = 1 + random.random()
+            retry_interval = random.uniform(0, min_interval)
             retry_timing = (
                 ""
                 if i == FILE_READING_RETRY - 1
-                else (f"Retry after {min_interval} sec. ")
-            )
-            log_only_show_in_1st_retry = (
-                ""
-                if i
-                else (
-                    f"If earlier read attempt threw certain Exception"
-                    f", it may or may not be an issue depends on these retries "
-                    f"succeed or not. serialized_pieces:{serialized_pieces}"
-                )
+                else (f"Retry after {retry_interval:.2f} sec. ")
             )
             logger.exception(
-                f"{i + 1}th attempt to deserialize ParquetFileFragment failed. "
-                f"{retry_timing}"
-                f"{log_only_show_in_1st_retry}"
+                f"{i + 1}th attempt to {description} failed. {retry_timing}"
+                f"{'' if i else first_failure_message}"
             )
-            if not min_interval:
-                # to make retries of different process hit hdfs server
-                # at slightly different time
-                min_interval = 1 + random.random()
-            # exponential backoff at
-            # 1, 2, 4, 8, 16, 32, 64
-            time.sleep(min_interval)
-            min_interval = min_interval * 2
+            if i < FILE_READING_RETRY - 1:
+                time.sleep(retry_interval)
+            min_interval = min(MAX_RETRY_BACKOFF, min_interval * 2)
             final_exception = e
     raise final_exception
 
 
+# This retry helps when the upstream datasource is not able to handle
+# overloaded read request or failed with some retriable failures.
+# For example when reading data from HA hdfs service, hdfs might
+# lose connection for some unknown reason expecially when
+# simutaneously running many hyper parameter tuning jobs
+# with ray.data parallelism setting at high value like the default 200
+# Such connection failure can be restored with some waiting and retry.
+def _deserialize_pieces_with_retry(
+    serialized_pieces: _SerializedPieceGroup,
+) -> List["pyarrow._dataset.ParquetFileFragment"]:
+    return _retry_with_backoff(
+        lambda: _deserialize_pieces(serialized_pieces),
+        (Exception,),
+        "deserialize ParquetFileFragment",
+        first_failure_message=(
+            f"If earlier read attempt threw certain Exception"
+            f", it may or may not be an issue depends on these retries "
+            f"succeed or not. serialized_pieces:{serialized_pieces}"
+        ),
+    )
+
+
 @PublicAPI
 class ParquetDatasource(ParquetBaseDatasource):
     """Parquet datasource, for reading and writing Parquet files.
@@ -154,7 +252,6 @@ class _ParquetDatasourceReader(Reader):
         **reader_args,
     ):
         _check_pyarrow_version()
-        import pyarrow as pa
         import pyarrow.parquet as pq
 
         paths, filesystem = _resolve_paths_and_filesystem(paths, filesystem)
@@ -171,23 +268,12 @@ class _ParquetDatasourceReader(Reader):
         if schema is None:
             schema = pq_ds.schema
         if columns:
-            schema = pa.schema(
+            schema = pyarrow.schema(
                 [schema.field(column) for column in columns], schema.metadata
             )
 
         if _block_udf is not None:
-            # Try to infer dataset schema by passing dummy table through UDF.
-            dummy_table = schema.empty_table()
-            try:
-                inferred_schema = _block_udf(dummy_table).schema
-                inferred_schema = inferred_schema.with_metadata(schema.metadata)
-            except Exception:
-                logger.debug(
-                    "Failed to infer schema of dataset by passing dummy table "
-                    "through UDF due to the following exception:",
-                    exc_info=True,
-                )
-                inferred_schema = schema
+            inferred_schema = _infer_block_udf_schema(_block_udf, schema)
         else:
             inferred_schema = schema
 
@@ -204,13 +290,20 @@ class _ParquetDatasourceReader(Reader):
         self._schema = schema
 
     def estimate_inmemory_data_size(self) -> Optional[int]:
-        # TODO(ekl/chengsu) better estimate the in-memory size here,
-        # when columns pruning is used.
         total_size = 0
         for file_metadata in self._metadata:
+            if self._columns:
+                # Only count the column chunks of the selected columns.
+                column_indices = _column_chunk_indices(file_metadata, self._columns)
             for row_group_idx in range(file_metadata.num_row_groups):
                 row_group_metadata = file_metadata.row_group(row_group_idx)
-                total_size += row_group_metadata.total_byte_size
+                if self._columns:
+                    total_size += sum(
+                        row_group_metadata.column(i).total_uncompressed_size
+                        for i in column_indices
+                    )
+                else:
+                    total_size += row_group_metadata.total_byte_size
         return total_size * PARQUET_TO_ARROW_SIZE_MULTIPLIER
 
     def get_read_tasks(self, parallelism: int) -> List[ReadTask]:
@@ -218,45 +311,253 @@ class _ParquetDatasourceReader(Reader):
         # method in order to leverage pyarrow's ParquetDataset abstraction,
         # which simplifies partitioning logic. We still use
         # FileBasedDatasource's write side (do_write), however.
+        import pyarrow.parquet as pq
+
         read_tasks = []
-        for pieces, metadata in zip(
-            np.array_split(self._pq_ds.pieces, parallelism),
-            np.array_split(self._metadata, parallelism),
-        ):
+        has_file_metadata = len(self._metadata) == len(self._pq_ds.pieces) and all(
+            isinstance(m, pq.FileMetaData) for m in self._metadata
+        )
+        if has_file_metadata:
+            pieces, metadata = self._pq_ds.pieces, self._metadata
+            if len(pieces) < parallelism:
+                # Not enough files to honor the requested parallelism, so read
+                # the row groups of each file in separate read tasks.
+                pieces, metadata = _split_pieces_by_row_group(pieces, metadata)
+            # Balance the read tasks by bytes rather than by number of files, so
+            # that a few large files don't dominate the read time.
+            splits = [
+                _merge_row_group_pieces(split_pieces, split_metadata)
+                for split_pieces, split_metadata in _split_pieces_by_size(
+                    pieces, metadata, parallelism
+                )
+            ]
+        else:
+            splits = zip(
+                _split_list(self._pq_ds.pieces, parallelism),
+                _split_list(self._metadata, parallelism),
+            )
+        # The read context shared by all read tasks, bound once as positional args.
+        read_fn = functools.partial(
+            _read_pieces,
+            self._block_udf,
+            self._reader_args,
+            self._columns,
+            self._schema,
+        )
+        target_max_block_size = DatasetContext.get_current().target_max_block_size
+        for pieces, metadata in splits:
             if len(pieces) <= 0:
                 continue
-            serialized_pieces = [_SerializedPiece(p) for p in pieces]
-            input_files = [p.path for p in pieces]
+            batch_size = (
+                _estimate_batch_size(metadata, self._columns, target_max_block_size)
+                if has_file_metadata
+                else PARQUET_READER_ROW_BATCH_SIZE
+            )
+            serialized_pieces = _SerializedPieceGroup(
+                pieces,
+                [
+                    m.row_groups if isinstance(m, _RowGroupsMetadata) else None
+                    for m in metadata
+                ],
+            )
+            # Pieces split by row group share the same file path.
+            input_files = list(dict.fromkeys(p.path for p in pieces))
             meta = self._meta_provider(
                 input_files,
                 self._inferred_schema,
                 pieces=pieces,
                 prefetched_metadata=metadata,
             )
-            block_udf, reader_args, columns, schema = (
-                self._block_udf,
-                self._reader_args,
-                self._columns,
-                self._schema,
-            )
             read_tasks.append(
                 ReadTask(
-                    lambda p=serialized_pieces: _read_pieces(
-                        block_udf,
-                        reader_args,
-                        columns,
-                        schema,
-                        p,
-                    ),
-                    meta,
+                    functools.partial(read_fn, batch_size, serialized_pieces), meta
                 )
             )
 
         return read_tasks
 
 
+def _split_list(seq: List[Any], n: int) -> List[List[Any]]:
+    """Splits the list into n contiguous sublists whose lengths differ by at most 1.
+
+    Same as ``np.array_split()``, but without converting the list to an object
+    array and back.
+    """
+    k, m = divmod(len(seq), n)
+    return [seq[i * k + min(i, m) : (i + 1) * k + min(i + 1, m)] for i in range(n)]
+
+
+class _RowGroupsMetadata:
+    """Parquet file metadata restricted to a subset of the file's row groups.
+
+    This is used as the prefetched metadata of file fragments split by row group,
+    and exposes the same row group accessors as ``pyarrow.parquet.FileMetaData``.
+    """
+
+    def __init__(
+        self, file_metadata: "pyarrow.parquet.FileMetaData", row_groups: List[int]
+    ):
+        self._file_metadata = file_metadata
+        self.row_groups = row_groups
+
+    @property
+    def num_row_groups(self) -> int:
+        return len(self.row_groups)
+
+    @property
+    def num_rows(self) -> int:
+        return sum(self._file_metadata.row_group(i).num_rows for i in self.row_groups)
+
+    def row_group(self, i: int) -> "pyarrow.parquet.RowGroupMetaData":
+        return self._file_metadata.row_group(self.row_groups[i])
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._file_metadata, name)
+
+
+def _split_pieces_by_row_group(
+    pieces: List["pyarrow.dataset.ParquetFileFragment"],
+    metadata: List["pyarrow.parquet.FileMetaData"],
+) -> Tuple[
+    List["pyarrow.dataset.ParquetFileFragment"],
+    List[Union["pyarrow.parquet.FileMetaData", _RowGroupsMetadata]],
+]:
+    """Splits the pieces with multiple row groups into one piece per row group."""
+    split_pieces, split_metadata = [], []
+    for piece, file_metadata in zip(pieces, metadata):
+        if file_metadata.num_row_groups <= 1:
+            split_pieces.append(piece)
+            split_metadata.append(file_metadata)
+            continue
+        for i in range(file_metadata.num_row_groups):
+            # Build the fragments from the prefetched metadata rather than with
+            # piece.split_by_row_group(), which may read the file footer again.
+            split_pieces.append(
+                piece.format.make_fragment(
+                    piece.path,
+                    piece.filesystem,
+                    piece.partition_expression,
+                    row_groups=[i],
+                )
+            )
+            split_metadata.append(_RowGroupsMetadata(file_metadata, [i]))
+    return split_pieces, split_metadata
+
+
+def _merge_row_group_pieces(
+    pieces: List["pyarrow.dataset.ParquetFileFragment"],
+    metadata: List[Union["pyarrow.parquet.FileMetaData", _RowGroupsMetadata]],
+) -> Tuple[
+    List["pyarrow.dataset.ParquetFileFragment"],
+    List[Union["pyarrow.parquet.FileMetaData", _RowGroupsMetadata]],
+]:
+    """Merges consecutive pieces reading row groups of the same file into one piece.
+
+    Arrow reads the footer of the file for every fragment, so a read task reads all
+    of its row groups of a file through a single fragment.
+    """
+    # List of [piece, metadata, row groups or None if the piece reads the file].
+    runs = []
+    for piece, m in zip(pieces, metadata):
+        if (
+            isinstance(m, _RowGroupsMetadata)
+            and runs
+            and runs[-1][2] is not None
+            and runs[-1][0].path == piece.path
+            # make_fragment() reads the row groups in the iteration order of
+            # set(row_groups), so only merge while that keeps them in file order.
+            and list(set(runs[-1][2] + m.row_groups)) == runs[-1][2] + m.row_groups
+        ):
+            runs[-1][2].extend(m.row_groups)
+        else:
+            row_groups = (
+                list(m.row_groups) if isinstance(m, _RowGroupsMetadata) else None
+            )
+            runs.append([piece, m, row_groups])
+    merged_pieces, merged_metadata = [], []
+    for piece, m, row_groups in runs:
+        if row_groups is not None and len(row_groups) > m.num_row_groups:
+            piece = piece.format.make_fragment(
+                piece.path,
+                piece.filesystem,
+                piece.partition_expression,
+                row_groups=row_groups,
+            )
+            m = _RowGroupsMetadata(m._file_metadata, row_groups)
+        merged_pieces.append(piece)
+        merged_metadata.append(m)
+    return merged_pieces, merged_metadata
+
+
+def _split_pieces_by_size(
+    pieces: List["pyarrow.dataset.ParquetFileFragment"],
+    metadata: List[Union["pyarrow.parquet.FileMetaData", _RowGroupsMetadata]],
+    parallelism: int,
+) -> List[
+    Tuple[
+        List["pyarrow.dataset.ParquetFileFragment"],
+        List["pyarrow.parquet.FileMetaData"],
+    ]
+]:
+    """Splits the pieces into at most ``parallelism`` groups of similar byte size.
+
+    The groups are contiguous, so the pieces keep their original order. A piece
+    goes to the group whose share of the total bytes contains the middle of the
+    piece, which cuts the pieces where the running byte total passes each multiple
+    of ``total / parallelism``.
+    """
+    sizes = [
+        sum(m.row_group(i).total_byte_size for i in range(m.num_row_groups))
+        for m in metadata
+    ]
+    total_size = sum(sizes)
+    if total_size == 0:
+        return list(
+            zip(_split_list(pieces, parallelism), _split_list(metadata, parallelism))
+        )
+    groups = [[] for _ in range(parallelism)]
+    running_size = 0
+    for piece_idx, size in enumerate(sizes):
+        midpoint = running_size + size / 2
+        group_idx = min(parallelism - 1, int(midpoint * parallelism / total_size))
+        groups[group_idx].append(piece_idx)
+        running_size += size
+    return [([pieces[i] for i in g], [metadata[i] for i in g]) for g in groups if g]
+
+
+def _infer_block_udf_schema(
+    block_udf: Callable[[Block], Block], schema: "pyarrow.lib.Schema"
+) -> "pyarrow.lib.Schema":
+    """Infer the schema of the blocks produced by the given block UDF.
+
+    UDFs can set ``__ray_block_udf_preserves_schema__ = True`` to declare that they
+    don't change the schema, in which case the UDF isn't probed at all.
+    """
+    if getattr(block_udf, "__ray_block_udf_preserves_schema__", False):
+        return schema
+    # Try to infer dataset schema by passing dummy table through UDF.
+    dummy_table = schema.empty_table()
+    try:
+        inferred_schema = block_udf(dummy_table).schema
+        return inferred_schema.with_metadata(schema.metadata)
+    except Exception:
+        logger.debug(
+            "Failed to infer schema of dataset by passing dummy table "
+            "through UDF due to the following exception:",
+            exc_info=True,
+        )
+        return schema
+
+
 def _read_pieces(
-    block_udf, reader_args, columns, schema, serialized_pieces: List[_SerializedPiece]
+    block_udf,
+    reader_args,
+    columns,
+    schema,
+    batch_size: int,
+    serialized_pieces: _SerializedPieceGroup,
 ) -> Iterator["pyarrow.Table"]:
     # Deserialize after loading the filesystem class.
     pieces: List[
@@ -266,9 +567,7 @@ def _read_pieces(
     # Ensure that we're reading at least one dataset fragment.
     assert len(pieces) > 0
 
-    import pyarrow as pa
-    from pyarrow.dataset import _get_partition_keys
-
+    pyarrow_dataset = _lazy_import_pyarrow_dataset()
     ctx = DatasetContext.get_current()
     output_buffer = BlockOutputBuffer(
         block_udf=block_udf,
@@ -276,28 +575,39 @@ def _read_pieces(
     )
 
     logger.debug(f"Reading {len(pieces)} parquet pieces")
-    use_threads = reader_args.pop("use_threads", False)
+    # Don't mutate reader_args, since it's shared by all read tasks and retries.
+    use_threads = reader_args.get("use_threads", True)
+    batches_kwargs = {k: v for k, v in reader_args.items() if k != "use_threads"}
+    batch_size = batches_kwargs.pop("batch_size", None) or batch_size
     for piece in pieces:
-        part = _get_partition_keys(piece.partition_expression)
-        batches = piece.to_batches(
-            use_threads=use_threads,
-            columns=columns,
-            schema=schema,
-            batch_size=PARQUET_READER_ROW_BATCH_SIZE,
-            **reader_args,
+        part = pyarrow_dataset._get_partition_keys(piece.partition_expression)
+        # The types of the partition values, which the partition columns are cast to.
+        part_types = {col: pyarrow.array([value]).type for col, value in part.items()}
+        # The schema of the batches with cast partition columns, which is built from
+        # the first batch and shared by all other batches of the piece.
+        part_schema = None
+        batches = _prefetch_batches(
+            piece.to_batches(
+                use_threads=use_threads,
+                columns=columns,
+                schema=schema,
+                batch_size=batch_size,
+                **batches_kwargs,
+            ),
+            PARQUET_READER_PREFETCH_BATCHES,
         )
+        # Partition columns are filled in by Arrow from the partition expression of
+        # the piece, since they are part of the dataset schema. Arrow uses the type
+        # of the partition field, e.g. dictionary encoded strings for hive
+        # partitioning, so cast them to the types of the partition values.
         for batch in batches:
-            table = pa.Table.from_batches([batch], schema=schema)
-            if part:
-                for col, value in part.items():
-                    table = table.set_column(
-                        table.schema.get_field_index(col),
-                        col,
-                        pa.array([value] * len(table)),
-                    )
-            # If the table is empty, drop it.
-            if table.num_rows > 0:
-                output_buffer.add_block(table)
+            if part_types:
+                if part_schema is None:
+                    part_schema = _partition_schema(batch.schema, part_types)
+                batch = _cast_partition_columns(batch, part_schema, part_types)
+            # If the batch is empty, drop it.
+            if batch.num_rows > 0:
+                output_buffer.add_record_batch(batch)
                 if output_buffer.has_next():
                     yield output_buffer.next()
     output_buffer.finalize()
@@ -305,24 +615,209 @@ def _read_pieces(
         yield output_buffer.next()
 
 
+def _partition_schema(
+    schema: "pyarrow.lib.Schema", part_types: Dict[str, "pyarrow.DataType"]
+) -> "pyarrow.lib.Schema":
+    """Returns the schema with the partition columns set to the given types."""
+    for col, value_type in part_types.items():
+        index = schema.get_field_index(col)
+        if index >= 0:
+            schema = schema.set(index, pyarrow.field(col, value_type))
+    return schema
+
+
+def _cast_partition_columns(
+    batch: "pyarrow.RecordBatch",
+    part_schema: "pyarrow.lib.Schema",
+    part_types: Dict[str, "pyarrow.DataType"],
+) -> "pyarrow.RecordBatch":
+    """Casts the partition columns of the batch to the given types."""
+    arrays = batch.columns
+    for col, value_type in part_types.items():
+        index = batch.schema.get_field_index(col)
+        if index < 0:
+            # The partition column isn't read.
+            continue
+        array = arrays[index]
+        if pyarrow.types.is_dictionary(array.type):
+            array = array.dictionary_decode()
+        if array.type != value_type:
+            array = array.cast(value_type)
+        arrays[index] = array
+    return pyarrow.RecordBatch.from_arrays(arrays, schema=part_schema)
+
+
+def _column_chunk_indices(
+    file_metadata: Union["pyarrow.parquet.FileMetaData", _RowGroupsMetadata],
+    columns: List[str],
+) -> List[int]:
+    """Returns the indices of the column chunks that store the given columns.
+
+    Nested columns are stored as one column chunk per leaf field, in the order of
+    the fields of the Arrow schema, so the chunks of each top-level column are the
+    range of its leaf fields. This matches column names that contain dots, unlike
+    the dotted paths of the column chunks.
+    """
+    columns = set(columns)
+    arrow_schema = file_metadata.schema.to_arrow_schema()
+    indices = []
+    start = 0
+    for field in arrow_schema:
+        num_leaves = _num_leaf_fields(field.type)
+        if field.name in columns:
+            indices.extend(range(start, start + num_leaves))
+        start += num_leaves
+    if start != file_metadata.num_columns:
+        # The Arrow schema doesn't line up with the Parquet columns, so fall back
+        # to matching the first component of the column paths.
+        return [
+            i
+            for i in range(file_metadata.num_columns)
+            if file_metadata.schema.column(i).path.split(".", 1)[0] in columns
+        ]
+    return indices
+
+
+def _num_leaf_fields(field_type: "pyarrow.DataType") -> int:
+    """Returns the number of Parquet leaf columns that store the Arrow type."""
+    if isinstance(field_type, pyarrow.ExtensionType):
+        return _num_leaf_fields(field_type.storage_type)
+    if pyarrow.types.is_struct(field_type):
+        return sum(
+            _num_leaf_fields(field_type[i].type) for i in range(field_type.num_fields)
+        )
+    if pyarrow.types.is_map(field_type):
+        return _num_leaf_fields(field_type.key_type) + _num_leaf_fields(
+            field_type.item_type
+        )
+    if (
+        pyarrow.types.is_list(field_type)
+        or pyarrow.types.is_large_list(field_type)
+        or pyarrow.types.is_fixed_size_list(field_type)
+    ):
+        return _num_leaf_fields(field_type.value_type)
+    return 1
+
+
+def _estimate_batch_size(
+    metadata: List[Union["pyarrow.parquet.FileMetaData", _RowGroupsMetadata]],
+    columns: Optional[List[str]],
+    target_max_block_size: int,
+) -> int:
+    """Estimate the number of rows per batch for batches of the target size.
+
+    The row size is the uncompressed size of the row groups to read divided by
+    their number of rows, scaled by the share of the read columns in the first row
+    group.
+    """
+    num_rows = num_bytes = 0
+    first_metadata = first_row_group = None
+    for m in metadata:
+        for i in range(m.num_row_groups):
+            row_group = m.row_group(i)
+            num_rows += row_group.num_rows
+            num_bytes += row_group.total_byte_size
+            if first_row_group is None:
+                first_metadata, first_row_group = m, row_group
+    if num_rows == 0 or num_bytes == 0:
+        return PARQUET_READER_ROW_BATCH_SIZE
+    if columns is not None:
+        column_sizes = [
+            first_row_group.column(j).total_uncompressed_size
+            for j in range(first_row_group.num_columns)
+        ]
+        total_bytes = sum(column_sizes)
+        read_bytes = sum(
+            column_sizes[j] for j in _column_chunk_indices(first_metadata, columns)
+        )
+        if total_bytes > 0:
+            num_bytes = num_bytes * read_bytes / total_bytes
+    row_bytes = max(1, num_bytes / num_rows)
+    return min(
+        PARQUET_READER_MAX_ROW_BATCH_SIZE,
+        max(PARQUET_READER_MIN_ROW_BATCH_SIZE, int(target_max_block_size // row_bytes)),
+    )
+
+
+def _prefetch_batches(
+    batches: Iterator["pyarrow.RecordBatch"], prefetch_depth: int
+) -> Iterator["pyarrow.RecordBatch"]:
+    """Reads up to ``prefetch_depth`` batches ahead in a background thread."""
+    done = object()
+    batch_queue = queue.Queue(maxsize=prefetch_depth)
+    stopped = threading.Event()
+
+    def put(item) -> bool:
+        # Give up once the consumer stopped, so that the producer doesn't block on
+        # a full queue forever.
+        while not stopped.is_set():
+            try:
+                batch_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for batch in batches:
+                if not put(batch):
+                    return
+        except Exception as e:
+            put(_PrefetchError(e))
+        else:
+            put(done)
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = batch_queue.get()
+            if item is done:
+                break
+            if isinstance(item, _PrefetchError):
+                raise item.error
+            yield item
+    finally:
+        stopped.set()
+        producer.join()
+
+
+class _PrefetchError:
+    def __init__(self, error: Exception):
+        self.error = error
+
+
 def _fetch_metadata_remotely(
     pieces: List["pyarrow._dataset.ParquetFileFragment"],
 ) -> List[ObjectRef["pyarrow.parquet.FileMetaData"]]:
 
-    remote_fetch_metadata = cached_remote_fn(_fetch_metadata_serialization_wrapper)
+    ctx = DatasetContext.get_current()
+    if ctx.scheduling_strategy == DEFAULT_SCHEDULING_STRATEGY:
+        # Spread the metadata fetch tasks across the cluster so that we don't
+        # throttle the storage service from a single (head) node.
+        scheduling_strategy = "SPREAD"
+    else:
+        scheduling_strategy = ctx.scheduling_strategy
+    remote_fetch_metadata = cached_remote_fn(
+        _fetch_metadata_serialization_wrapper
+    ).options(
+        scheduling_strategy=scheduling_strategy,
+        num_cpus=NUM_CPUS_FOR_META_FETCH_TASK,
+    )
     metas = []
     parallelism = min(len(pieces) // PIECES_PER_META_FETCH, 100)
     meta_fetch_bar = ProgressBar("Metadata Fetch Progress", total=parallelism)
-    for pcs in np.array_split(pieces, parallelism):
+    for pcs in _split_list(pieces, parallelism):
         if len(pcs) == 0:
             continue
-        metas.append(remote_fetch_metadata.remote([_SerializedPiece(p) for p in pcs]))
+        metas.append(remote_fetch_metadata.remote(_SerializedPieceGroup(pcs)))
     metas = meta_fetch_bar.fetch_until_complete(metas)
     return list(itertools.chain.from_iterable(metas))
 
 
 def _fetch_metadata_serialization_wrapper(
-    pieces: str,
+    pieces: _SerializedPieceGroup,
 ) -> List["pyarrow.parquet.FileMetaData"]:
 
     pieces: List[
@@ -335,10 +830,24 @@ def _fetch_metadata_serialization_wrapper(
 def _fetch_metadata(
     pieces: List["pyarrow.dataset.ParquetFileFragment"],
 ) -> List["pyarrow.parquet.FileMetaData"]:
+    # NOTE: Accessing the fragment metadata already reads the footer with a single
+    # speculative read of the last 64KiB of the file on the Arrow C++ side, only
+    # issuing a second read for larger footers, so we don't read it ourselves.
     piece_metadata = []
     for p in pieces:
         try:
-            piece_metadata.append(p.metadata)
+            piece_metadata.append(_fetch_piece_metadata_with_retry(p))
         except AttributeError:
             break
     return piece_metadata
+
+
+# Same as _deserialize_pieces_with_retry, this retry helps when the upstream
+# storage service is throttling or failing metadata reads with retriable
+# errors (e.g. S3 throttling when fetching metadata for many files at once).
+def _fetch_piece_metadata_with_retry(
+    piece: "pyarrow.dataset.ParquetFileFragment",
+) -> "pyarrow.parquet.FileMetaData":
+    return _retry_with_backoff(
+        lambda: piece.metadata, (OSError,), f"fetch metadata of {piece.path}"
+    )
@@ -35,12 +35,20 @@ from ray.data.datasource import (
     SimpleTorchDatasource,
     WriteResult,
 )
-from ray.data.datasource.file_based_datasource import _unwrap_protocol
+from ray.data.datasource.file_based_datasource import (
+    _resolve_paths_and_filesystem,
+    _unwrap_protocol,
+)
 from ray.data.datasource.parquet_datasource import (
     PARALLELIZE_META_FETCH_THRESHOLD,
     _ParquetDatasourceReader,
-    _SerializedPiece,
+    _RowGroupsMetadata,
+    _SerializedPieceGroup,
     _deserialize_pieces_with_retry,
+    _estimate_batch_size,
+    _fetch_metadata,
+    _prefetch_batches,
+    _split_pieces_by_size,
 )
 from ray.data.extensions import TensorDtype
 from ray.data.preprocessors import BatchMapper
@@ -335,6 +343,64 @@ def test_fsspec_http_file_system(ray_start_regular_shared, http_server, http_fil
     assert ds.count() > 0
 
 
+def test_fsspec_s3_file_system(
+    ray_start_regular_shared, aws_credentials, s3_server, s3_fs, s3_path
+):
+    from s3fs.core import S3FileSystem
+
+    pq.write_table(
+        pa.table({"one": [1, 2, 3]}),
+        os.path.join(_unwrap_protocol(s3_path), "test1.parquet"),
+        filesystem=s3_fs,
+    )
+    fs = S3FileSystem(
+        key=aws_credentials["access_key"],
+        secret=aws_credentials["secret_key"],
+        client_kwargs={"endpoint_url": s3_server, "region_name": "us-west-2"},
+    )
+
+    # s3fs filesystems are replaced with the native pyarrow S3 filesystem.
+    _, resolved_fs = _resolve_paths_and_filesystem(s3_path, fs)
+    assert isinstance(resolved_fs, pa.fs.S3FileSystem)
+
+    ds = ray.data.read_parquet(s3_path, filesystem=fs)
+    assert ds.count() == 3
+    assert sorted(s["one"] for s in ds.take()) == [1, 2, 3]
+
+    # Options that pyarrow doesn't support keep using s3fs.
+    fs = S3FileSystem(
+        key=aws_credentials["access_key"],
+        secret=aws_credentials["secret_key"],
+        client_kwargs={"endpoint_url": s3_server, "region_name": "us-west-2"},
+        config_kwargs={"retries": {"max_attempts": 3}},
+    )
+    _, resolved_fs = _resolve_paths_and_filesystem(s3_path, fs)
+    assert isinstance(resolved_fs, pa.fs.PyFileSystem)
+
+    # A top-level endpoint_url is carried over to pyarrow.
+    fs = S3FileSystem(
+        key=aws_credentials["access_key"],
+        secret=aws_credentials["secret_key"],
+        endpoint_url=s3_server,
+        client_kwargs={"region_name": "us-west-2"},
+        skip_instance_cache=True,
+    )
+    _, resolved_fs = _resolve_paths_and_filesystem(s3_path, fs)
+    assert isinstance(resolved_fs, pa.fs.S3FileSystem)
+    ds = ray.data.read_parquet(s3_path, filesystem=fs)
+    assert ds.count() == 3
+
+    # Botocore session options such as profile keep using s3fs.
+    fs = S3FileSystem(
+        profile="default",
+        endpoint_url=s3_server,
+        client_kwargs={"region_name": "us-west-2"},
+        skip_instance_cache=True,
+    )
+    _, resolved_fs = _resolve_paths_and_filesystem(s3_path, fs)
+    assert isinstance(resolved_fs, pa.fs.PyFileSystem)
+
+
 def test_read_example_data(ray_start_regular_shared, tmp_path):
     ds = ray.data.read_csv("example://iris.csv")
     assert ds.count() == 150
@@ -390,7 +456,7 @@ def test_parquet_deserialize_pieces_with_retry(
     pq_ds = pq.ParquetDataset(
         data_path, **dataset_kwargs, filesystem=fs, use_legacy_dataset=False
     )
-    serialized_pieces = [_SerializedPiece(p) for p in pq_ds.pieces]
+    serialized_pieces = _SerializedPieceGroup(pq_ds.pieces)
 
     # test 1st attempt succeed
     pieces = _deserialize_pieces_with_retry(serialized_pieces)
@@ -427,6 +493,108 @@ def test_parquet_deserialize_pieces_with_retry(
     assert "test2.parquet" in retried_pieces[1].path
 
 
+def test_parquet_fetch_metadata_with_retry(tmp_path, monkeypatch):
+    path = os.path.join(tmp_path, "test1.parquet")
+    pq.write_table(pa.table({"one": [1, 2, 3]}), path)
+    metadata = pq.read_metadata(path)
+
+    # Mock a fragment whose metadata access fails twice with a retriable error.
+    class MockPiece:
+        def __init__(self, num_failures):
+            self.path = path
+            self.num_failures = num_failures
+
+        @property
+        def metadata(self):
+            if self.num_failures > 0:
+                self.num_failures -= 1
+                raise OSError("mock failed attempt")
+            return metadata
+
+    monkeypatch.setattr("time.sleep", lambda _: None)
+    piece_metadata = _fetch_metadata([MockPiece(2), MockPiece(0)])
+    assert len(piece_metadata) == 2
+    assert all(m.num_rows == 3 for m in piece_metadata)
+
+
+def test_parquet_prefetch_batches():
+    assert list(_prefetch_batches(iter(range(10)), 2)) == list(range(10))
+    assert list(_prefetch_batches(iter([]), 2)) == []
+
+    def failing_batches():
+        yield 0
+        raise ValueError("mock failed read")
+
+    batches = _prefetch_batches(failing_batches(), 2)
+    assert next(batches) == 0
+    with pytest.raises(ValueError):
+        next(batches)
+
+    # Stopping early must not leave the producer thread blocked.
+    batches = _prefetch_batches(iter(range(100)), 2)
+    assert next(batches) == 0
+    batches.close()
+
+
+def test_parquet_estimate_batch_size(tmp_path):
+    # Rows with a ~1KiB string column and an int64 column.
+    table = pa.table(
+        {
+            "a": pa.array(range(10000), pa.int64()),
+            "s": [f"{i:04d}" + "x" * 1000 for i in range(10000)],
+        }
+    )
+    path = os.path.join(tmp_path, "test.parquet")
+    pq.write_table(table, path, row_group_size=2500)
+    metadata = [pq.read_metadata(path)]
+
+    # The row size comes from the metadata rather than from the schema.
+    batch_size = _estimate_batch_size(metadata, None, 10 * 1024 * 1024)
+    assert 10000 < batch_size < 11000
+    # Only the read columns count towards the row size.
+    assert _estimate_batch_size(metadata, ["s"], 10 * 1024 * 1024) < 11000
+    assert _estimate_batch_size(metadata, ["a"], 10 * 1024 * 1024) == 200000
+    # Clamped to the min batch size for wide rows.
+    assert _estimate_batch_size(metadata, None, 1024) == 4096
+    # Row groups split into separate pieces are sized the same way.
+    row_group_metadata = [_RowGroupsMetadata(metadata[0], [1, 2])]
+    assert _estimate_batch_size(
+        row_group_metadata, None, 10 * 1024 * 1024
+    ) == pytest.approx(batch_size, rel=0.01)
+
+
+def test_parquet_split_pieces_by_size():
+    class MockRowGroup:
+        def __init__(self, size):
+            self.total_byte_size = size
+
+    class MockMetadata:
+        def __init__(self, *row_group_sizes):
+            self.num_row_groups = len(row_group_sizes)
+            self._row_groups = [MockRowGroup(s) for s in row_group_sizes]
+
+        def row_group(self, i):
+            return self._row_groups[i]
+
+    pieces = ["a", "b", "c", "d", "e"]
+    metadata = [
+        MockMetadata(100),
+        MockMetadata(10, 10),
+        MockMetadata(30),
+        MockMetadata(50, 40),
+        MockMetadata(20),
+    ]
+    splits = _split_pieces_by_size(pieces, metadata, 2)
+    # The pieces are split at the midpoint of the total byte size in file order.
+    assert [p for p, _ in splits] == [["a", "b"], ["c", "d", "e"]]
+    for split_pieces, split_metadata in splits:
+        assert split_metadata == [metadata[pieces.index(p)] for p in split_pieces]
+
+    # Groups left empty are dropped.
+    splits = _split_pieces_by_size(pieces, metadata, 10)
+    assert [p for p, _ in splits] == [[p] for p in pieces]
+
+
 @pytest.mark.parametrize(
     "fs,data_path",
     [
@@ -758,6 +926,10 @@ def test_parquet_read_partitioned(ray_start_regular_shared, fs, data_path):
     # Forces a data read.
     values = [[s["one"], s["two"]] for s in ds.take()]
     assert ds._plan.execute()._num_computed() == 2
+    # Partition columns have the types of their values rather than of the
+    # partition fields.
+    for block in ray.get(ds.to_arrow_refs()):
+        assert block.schema.field("one").type == pa.int64()
     assert sorted(values) == [
         [1, "a"],
         [1, "b"],
@@ -842,6 +1014,10 @@ def test_parquet_read_partitioned_explicit(ray_start_regular_shared, tmp_path):
     # Forces a data read.
     values = [[s["one"], s["two"]] for s in ds.take()]
     assert ds._plan.execute()._num_computed() == 2
+    # Partition columns have the types of their values rather than of the
+    # partition fields.
+    for block in ray.get(ds.to_arrow_refs()):
+        assert block.schema.field("one").type == pa.int64()
     assert sorted(values) == [
         [1, "a"],
         [1, "b"],
@@ -895,6 +1071,34 @@ def test_parquet_read_with_udf(ray_start_regular_shared, tmp_path):
     np.testing.assert_array_equal(sorted(ones), np.array(one_data[:2]) + 1)
 
 
+def test_parquet_reader_block_udf_schema_probe(tmp_path):
+    table = pa.table({"one": [1, 2, 3]})
+    pq.write_table(table, os.path.join(str(tmp_path), "test.parquet"))
+    num_calls = 0
+
+    def _block_udf(block: pa.Table):
+        nonlocal num_calls
+        num_calls += 1
+        return block.append_column("two", pa.array([0] * len(block)))
+
+    reader = _ParquetDatasourceReader(str(tmp_path), _block_udf=_block_udf)
+    assert reader._inferred_schema.names == ["one", "two"]
+    assert num_calls == 1
+
+    # UDFs that declare that they preserve the schema aren't probed.
+    def _schema_preserving_block_udf(block: pa.Table):
+        nonlocal num_calls
+        num_calls += 1
+        return block
+
+    _schema_preserving_block_udf.__ray_block_udf_preserves_schema__ = True
+    reader = _ParquetDatasourceReader(
+        str(tmp_path), _block_udf=_schema_preserving_block_udf
+    )
+    assert reader._inferred_schema.names == ["one"]
+    assert num_calls == 1
+
+
 @pytest.mark.parametrize(
     "fs,data_path",
     [
@@ -931,6 +1135,31 @@ def test_parquet_read_parallel_meta_fetch(ray_start_regular_shared, fs, data_pat
     assert sorted(values) == list(range(3 * num_dfs))
 
 
+def test_parquet_read_split_row_groups(ray_start_regular_shared, tmp_path):
+    path = os.path.join(tmp_path, "test.parquet")
+    pq.write_table(pa.table({"one": list(range(100))}), path, row_group_size=10)
+
+    # A single file with 10 row groups is split into one read task per row group.
+    ds = ray.data.read_parquet(path, parallelism=10)
+    assert ds.num_blocks() == 10
+    assert ds.count() == 100
+    assert len(ds.input_files()) == 1
+    assert [s["one"] for s in ds.take(100)] == list(range(100))
+
+    # The row groups of a file read by the same task are merged into fewer pieces.
+    read_tasks = _ParquetDatasourceReader(path).get_read_tasks(4)
+    assert len(read_tasks) == 4
+    assert sum(len(read_task._read_fn.args[-1]) for read_task in read_tasks) < 10
+    ds = ray.data.read_parquet(path, parallelism=4)
+    assert ds.num_blocks() == 4
+    assert [s["one"] for s in ds.take(100)] == list(range(100))
+
+    # Row groups are only split when there are fewer files than read tasks.
+    ds = ray.data.read_parquet(path, parallelism=1)
+    assert ds.num_blocks() == 1
+    assert ds.count() == 100
+
+
 def test_parquet_reader_estimate_data_size(shutdown_only, tmp_path):
     ds = ray.data.range(1000)
     path = os.path.join(tmp_path, "test_parquet_dir")
@@ -944,6 +1173,53 @@ def test_parquet_reader_estimate_data_size(shutdown_only, tmp_path):
     ), "estimated data size is out of expected bound"
 
 
+def test_parquet_reader_estimate_data_size_with_columns(shutdown_only, tmp_path):
+    path = os.path.join(tmp_path, "test.parquet")
+    table = pa.table({"one": list(range(1000)), "two": [str(i) for i in range(1000)]})
+    pq.write_table(table, path)
+
+    full_size = _ParquetDatasourceReader(path).estimate_inmemory_data_size()
+    one_size = _ParquetDatasourceReader(
+        path, columns=["one"]
+    ).estimate_inmemory_data_size()
+    two_size = _ParquetDatasourceReader(
+        path, columns=["two"]
+    ).estimate_inmemory_data_size()
+    assert 0 < one_size < full_size
+    assert 0 < two_size < full_size
+    assert one_size + two_size == full_size
+
+
+def test_parquet_reader_estimate_data_size_with_dotted_columns(shutdown_only, tmp_path):
+    path = os.path.join(tmp_path, "test.parquet")
+    # The column chunk of "a.b" has the same dotted path as a field "b" nested in
+    # a struct column "a" would have.
+    table = pa.table(
+        {
+            "a.b": list(range(1000)),
+            "a": pa.array([{"x": i, "y": str(i)} for i in range(1000)]),
+        }
+    )
+    pq.write_table(table, path)
+
+    full_size = _ParquetDatasourceReader(path).estimate_inmemory_data_size()
+    dotted_size = _ParquetDatasourceReader(
+        path, columns=["a.b"]
+    ).estimate_inmemory_data_size()
+    struct_size = _ParquetDatasourceReader(
+        path, columns=["a"]
+    ).estimate_inmemory_data_size()
+    assert 0 < dotted_size < full_size
+    assert 0 < struct_size < full_size
+    assert dotted_size + struct_size == full_size
+
+    # The batch size estimate matches the columns the same way.
+    metadata = [pq.read_metadata(path)]
+    assert _estimate_batch_size(metadata, ["a.b"], 400 * 1024) > (
+        _estimate_batch_size(metadata, ["a"], 400 * 1024)
+    )
+
+
 @pytest.mark.parametrize(
     "fs,data_path,endpoint_url",
     [
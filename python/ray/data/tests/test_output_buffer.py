@@ -0,0 +1,61 @@
+import pyarrow as pa
+import pytest
+
+from ray.data._internal.output_buffer import BlockOutputBuffer
+
+
+def gen_batch(**columns):
+    return pa.RecordBatch.from_pydict(columns)
+
+
+def test_record_batch_schema_change():
+    buffer = BlockOutputBuffer(None, 1024 * 1024)
+    buffer.add_record_batch(gen_batch(a=[1, 2]))
+    # A batch with a different schema flushes the buffered batches, since they
+    # can't be combined into a single table.
+    buffer.add_record_batch(gen_batch(b=["x"]))
+    buffer.finalize()
+    assert buffer.has_next()
+    block = buffer.next()
+    assert block.num_rows == 3
+    assert block["a"].to_pylist() == [1, 2, None]
+    assert block["b"].to_pylist() == [None, None, "x"]
+    assert not buffer.has_next()
+
+
+def test_record_batch_order_with_other_inputs():
+    buffer = BlockOutputBuffer(None, 1024 * 1024)
+    buffer.add_record_batch(gen_batch(a=[1]))
+    buffer.add_record_batch(gen_batch(a=[2]))
+    # Buffered record batches are flushed before blocks and items are added.
+    buffer.add_block(pa.table({"a": [3]}))
+    buffer.add_record_batch(gen_batch(a=[4]))
+    buffer.add({"a": 5})
+    buffer.finalize()
+    assert buffer.next()["a"].to_pylist() == [1, 2, 3, 4, 5]
+
+
+def test_record_batch_has_next():
+    batch = gen_batch(a=list(range(100)))
+    buffer = BlockOutputBuffer(None, int(batch.nbytes * 1.5))
+    buffer.add_record_batch(batch)
+    assert not buffer.has_next()
+    # Buffered record batches count towards the target block size.
+    buffer.add_record_batch(batch)
+    assert buffer.has_next()
+    assert buffer.next().num_rows == 200
+    assert not buffer.has_next()
+
+    # Buffered record batches are returned once the buffer is finalized.
+    buffer.add_record_batch(batch)
+    assert not buffer.has_next()
+    buffer.finalize()
+    assert buffer.has_next()
+    assert buffer.next().num_rows == 100
+    assert not buffer.has_next()
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(pytest.main(["-v", __file__]))
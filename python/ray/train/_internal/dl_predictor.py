@@ -1,5 +1,5 @@
 import abc
-from typing import Dict, TypeVar, Union, List, Tuple
+from typing import TYPE_CHECKING, Dict, TypeVar, Union, List, Tuple
 
 import numpy as np
 import pandas as pd
@@ -8,6 +8,9 @@ from ray.air.util.data_batch_conversion import convert_pandas_to_batch_type, Dat
 from ray.air.util.tensor_extensions.pandas import TensorArray
 from ray.train.predictor import Predictor
 
+if TYPE_CHECKING:
+    import pyarrow
+
 TensorType = TypeVar("TensorType")
 TensorDtype = TypeVar("TensorDtype")
 
@@ -59,13 +62,31 @@ class DLPredictor(Predictor):
         self, data: pd.DataFrame, dtype: Union[TensorDtype, Dict[str, TensorDtype]]
     ) -> pd.DataFrame:
         tensors = convert_pandas_to_batch_type(data, DataType.NUMPY)
-
-        # Single numpy array.
         if isinstance(tensors, np.ndarray):
-            column_name = data.columns[0]
+            tensors = {data.columns[0]: tensors}
+        return self._predict_numpy(tensors, dtype)
+
+    def _predict_arrow(
+        self,
+        data: "pyarrow.Table",
+        dtype: Union[TensorDtype, Dict[str, TensorDtype]],
+    ) -> "pyarrow.Table":
+        import pyarrow
+
+        tensors = _convert_arrow_to_numpy(data)
+        return pyarrow.Table.from_pandas(self._predict_numpy(tensors, dtype))
+
+    def _predict_numpy(
+        self,
+        tensors: Dict[str, np.ndarray],
+        dtype: Union[TensorDtype, Dict[str, TensorDtype]],
+    ) -> pd.DataFrame:
+        # Single numpy array.
+        if len(tensors) == 1:
+            column_name, array = next(iter(tensors.items()))
             if isinstance(dtype, dict):
                 dtype = dtype[column_name]
-            model_input = self._array_to_tensor(tensors, dtype)
+            model_input = self._array_to_tensor(array, dtype)
 
         else:
             model_input = {
@@ -95,3 +116,38 @@ class DLPredictor(Predictor):
                 {"predictions": TensorArray(self._tensor_to_array(output))},
                 columns=["predictions"],
             )
+
+
+def _convert_arrow_to_numpy(table: "pyarrow.Table") -> Dict[str, np.ndarray]:
+    """Convert the columns of an Arrow table to numpy arrays.
+
+    The columns are converted without going through pandas. Arrays that are
+    read-only views of the Arrow buffers are copied, so that in-place operations
+    of the model can't write into the Arrow memory.
+    """
+    from ray.data._internal.arrow_block import ArrowBlockAccessor
+    from ray.data._internal.arrow_ops.transform_pyarrow import (
+        _is_column_extension_type,
+    )
+
+    # Tables converted from pandas can store the DataFrame index in columns, which
+    # aren't model inputs.
+    pandas_metadata = table.schema.pandas_metadata or {}
+    index_columns = {
+        column
+        for column in pandas_metadata.get("index_columns", [])
+        if isinstance(column, str)
+    }
+
+    arrays = {}
+    for column_name in table.column_names:
+        if column_name in index_columns:
+            continue
+        column = table.column(column_name)
+        if column.num_chunks == 1 and not _is_column_extension_type(column):
+            arrays[column_name] = column.chunk(0).to_numpy(zero_copy_only=False)
+        else:
+            arrays[column_name] = ArrowBlockAccessor(table).to_numpy(column_name)
+        if not arrays[column_name].flags.writeable:
+            arrays[column_name] = arrays[column_name].copy()
+    return arrays
@@ -132,13 +132,24 @@ class Predictor(abc.ABC):
             DataBatchType: Prediction result. The return type will be the same as the
                 input type.
         """
-        data_df = convert_batch_type_to_pandas(data)
-
         if not hasattr(self, "_preprocessor"):
             raise NotImplementedError(
                 "Subclasses of Predictor must call Predictor.__init__(preprocessor)."
             )
 
+        # Skip the conversion to pandas if the predictor can predict on Arrow tables
+        # directly. Preprocessors transform pandas batches, so this only applies
+        # without one.
+        if (
+            pa_table is not None
+            and isinstance(data, pa_table)
+            and not self._preprocessor
+            and self._can_predict_arrow()
+        ):
+            return self._predict_arrow(data, **kwargs)
+
+        data_df = convert_batch_type_to_pandas(data)
+
         if self._preprocessor:
             data_df = self._preprocessor.transform_batch(data_df)
 
@@ -181,6 +192,25 @@ class Predictor(abc.ABC):
 
         raise NotImplementedError
 
+    @classmethod
+    def _can_predict_arrow(cls) -> bool:
+        """Whether ``_predict_arrow`` can be used in place of ``_predict_pandas``.
+
+        This is the case if ``_predict_arrow`` is implemented, and
+        ``_predict_pandas`` isn't overridden by a subclass of the class that
+        implements it, since then ``_predict_arrow`` may skip the overridden logic.
+        """
+        mro = cls.__mro__
+
+        def defining_class_index(name: str) -> int:
+            return next(i for i, klass in enumerate(mro) if name in vars(klass))
+
+        arrow_index = defining_class_index("_predict_arrow")
+        return (
+            mro[arrow_index] is not Predictor
+            and defining_class_index("_predict_pandas") >= arrow_index
+        )
+
     def __reduce__(self):
         raise PredictorNotSerializableException(
             "Predictor instances are not serializable. Instead, you may want "
@@ -2,6 +2,7 @@ from typing import Optional
 from unittest import mock
 
 import pandas as pd
+import pyarrow as pa
 import pytest
 from ray.air.util.data_batch_conversion import DataType
 
@@ -145,6 +146,30 @@ def test_get_and_set_preprocessor():
     ]
 
 
+def test_predict_arrow_dispatch():
+    """Arrow tables are only passed to _predict_arrow if it replaces _predict_pandas."""
+
+    class ArrowPredictor(DummyPredictor):
+        def _predict_arrow(self, data: pa.Table, **kwargs) -> pa.Table:
+            return pa.table({"predictions": ["arrow"] * data.num_rows})
+
+    class PandasOverridePredictor(ArrowPredictor):
+        def _predict_pandas(self, data: pd.DataFrame, **kwargs) -> pd.DataFrame:
+            return pd.DataFrame({"predictions": ["pandas"] * len(data)})
+
+    input = pa.table({"x": [1, 2, 3]})
+    assert not DummyPredictor._can_predict_arrow()
+
+    assert ArrowPredictor._can_predict_arrow()
+    output = ArrowPredictor().predict(input)
+    assert output["predictions"].to_pylist() == ["arrow"] * 3
+
+    # _predict_pandas overridden below the class implementing _predict_arrow.
+    assert not PandasOverridePredictor._can_predict_arrow()
+    output = PandasOverridePredictor().predict(input)
+    assert output["predictions"].to_pylist() == ["pandas"] * 3
+
+
 if __name__ == "__main__":
     import sys
 
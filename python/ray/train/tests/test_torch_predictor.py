@@ -35,12 +35,14 @@ class DummyModelMultiOutput(torch.nn.Module):
         return [input_tensor, input_tensor]
 
 
-@pytest.fixture
+# The dummy model and preprocessor are stateless, so they can be shared by the
+# tests of this module.
+@pytest.fixture(scope="module")
 def model():
     return DummyModelSingleTensor()
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def preprocessor():
     return DummyPreprocessor()
 
@@ -67,6 +69,19 @@ def test_predict_model_not_training(model, use_gpu):
     assert not predictor.model.training
 
 
+def test_predict_inference_mode():
+    class DummyModelInferenceMode(torch.nn.Module):
+        def forward(self, input):
+            return torch.full_like(input, torch.is_inference_mode_enabled())
+
+    predictor = TorchPredictor(model=DummyModelInferenceMode())
+
+    data_batch = np.array([1, 2, 3])
+    predictions = predictor.predict(data_batch)
+
+    assert predictions.flatten().tolist() == [1, 1, 1]
+
+
 @pytest.mark.parametrize("batch_type", [np.ndarray, pd.DataFrame, pa.Table, dict])
 def test_predict(batch_type):
     predictor = TorchPredictor(model=DummyModelMultiInput())
@@ -80,6 +95,38 @@ def test_predict(batch_type):
     assert predictions.to_numpy().flatten().tolist() == [1.0, 2.0, 3.0]
 
 
+def test_predict_arrow_table_without_pandas(model, monkeypatch):
+    predictor = TorchPredictor(model=model)
+    # Arrow tables should be predicted on without converting them to pandas.
+    monkeypatch.setattr(
+        predictor, "_predict_pandas", lambda *args, **kwargs: pytest.fail()
+    )
+
+    data_batch = pa.table({"X": [1.0, 2.0, 3.0]})
+    predictions = predictor.predict(data_batch, dtype=torch.float)
+
+    assert isinstance(predictions, pa.Table)
+    predictions = convert_batch_type_to_pandas(predictions)
+    assert predictions.to_numpy().flatten().tolist() == [2.0, 4.0, 6.0]
+
+
+def test_predict_arrow_table_in_place_model():
+    class InPlaceModel(torch.nn.Module):
+        def forward(self, input):
+            return input.mul_(2)
+
+    predictor = TorchPredictor(model=InPlaceModel())
+
+    # Float64 inputs aren't cast, so the model gets the converted array itself.
+    data_batch = pa.table({"X": [1.0, 2.0, 3.0]})
+    predictions = predictor.predict(data_batch)
+
+    predictions = convert_batch_type_to_pandas(predictions)
+    assert predictions.to_numpy().flatten().tolist() == [2.0, 4.0, 6.0]
+    # The model must not write into the input's Arrow memory.
+    assert data_batch["X"].to_pylist() == [1.0, 2.0, 3.0]
+
+
 @pytest.mark.parametrize("use_gpu", [False, True])
 def test_predict_array(model, use_gpu):
     predictor = TorchPredictor(model=model, use_gpu=use_gpu)
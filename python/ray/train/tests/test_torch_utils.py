@@ -1,3 +1,5 @@
+from unittest import mock
+
 import numpy as np
 import pandas as pd
 import pytest
@@ -7,6 +9,7 @@ from ray.air._internal.torch_utils import (
     convert_pandas_to_torch_tensor,
     load_torch_model,
 )
+from ray.train.torch.train_loop_utils import _WrappedOptimizer
 
 data_batch = pd.DataFrame({"A": [1, 2, 3], "B": [4, 5, 6]})
 
@@ -95,6 +98,21 @@ class TestLoadTorchModel:
             load_torch_model(torch_module.state_dict())
 
 
+def test_wrapped_optimizer_zero_grad():
+    model = torch.nn.Linear(1, 1)
+    optimizer = torch.optim.SGD(model.parameters(), lr=0.1)
+    wrapped_optimizer = _WrappedOptimizer(optimizer)
+
+    with mock.patch.object(optimizer, "zero_grad") as zero_grad_mock:
+        # The wrapped optimizer's default is used if no arguments are passed.
+        wrapped_optimizer.zero_grad()
+        zero_grad_mock.assert_called_once_with()
+
+        zero_grad_mock.reset_mock()
+        wrapped_optimizer.zero_grad(set_to_none=True)
+        zero_grad_mock.assert_called_once_with(set_to_none=True)
+
+
 if __name__ == "__main__":
     import sys
 
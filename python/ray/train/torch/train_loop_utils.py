@@ -669,8 +669,8 @@ class _WrappedOptimizer(Optimizer):
     def state_dict(self):
         return self.optimizer.state_dict()
 
-    def zero_grad(self):
-        self.optimizer.zero_grad()
+    def zero_grad(self, *args, **kwargs):
+        self.optimizer.zero_grad(*args, **kwargs)
 
     def step(self, closure=None):
         if self.scaler is not None: